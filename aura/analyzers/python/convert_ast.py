@@ -90,9 +90,7 @@ def visit_Assign(context):
 
 
 def visit_BinOp(context):
-    left = context.node["right"]
-    right = context.node["left"]
-    new_node = BinOp(left=left, right=right, op=context.node["op"]["_type"].lower())
+    new_node = BinOp(left=context.node["left"], right=context.node["right"], op=context.node["op"]["_type"].lower())
     new_node.enrich_from_previous(context.node)
     context.replace(new_node)
     return new_node
@@ -16,8 +16,6 @@ from collections.abc import Hashable
 from dataclasses import dataclass, InitVar, field
 from functools import partial, total_ordering, wraps
 
-import chardet
-
 from ...stack import Stack
 from ...utils import KeepRefs, slotted_dataclass
 from ... import exceptions
@@ -27,6 +25,8 @@ BASIC_ELEMENTS = (
     str,
     int,
 )
+# Scalar values in the AST tree that can't contain any other nodes, these are never pushed to the visitor queue
+LEAF_TYPES = frozenset((str, int, float, complex, bool, bytes, type(...), type(None)))
 logger = logging.getLogger(__name__)
 
 
@@ -493,6 +493,8 @@ class Bytes(ASTNode):
         try:
             return self.value.decode()
         except UnicodeDecodeError:
+            import chardet
+
             encoding = chardet.detect(self.value)["encoding"]
             return self.value.decode(encoding)
 
@@ -1435,7 +1437,9 @@ class Container(ASTNode):
 
 
 @slotted_dataclass(
-    replace=field(default=lambda x: None),
+    parent_container=field(default=None),
+    parent_key=field(default=None),
+    replace_callback=field(default=lambda x: None),
     visitor=field(default=None),
     stack=field(default_factory=Stack),
     depth=field(default=0),
@@ -1445,15 +1449,18 @@ class Container(ASTNode):
 )
 class Context:
     __slots__ = (
-        "node", "parent", "replace",
+        "node", "parent", "parent_container", "parent_key", "replace_callback",
         "visitor", "stack", "depth",
         "modified", "shared_state", "scope_closure"
     )
 
     node: NodeType
     parent: typing.Union[Context, None]
+    # Container (dict/list) holding the node and the key/index under which it is stored
+    parent_container: typing.Union[dict, list, None]
+    parent_key: typing.Any
     # can_replace: bool = True
-    replace: typing.Callable[[NodeType], None]
+    replace_callback: typing.Callable[[NodeType], None]
     visitor: typing.Any # FIXME typing
     stack: Stack
     depth: int
@@ -1465,23 +1472,39 @@ class Context:
     def call_graph(self):
         return self.visitor.call_graph
 
-    def as_child(self, node: NodeType, replace=lambda x: None) -> Context:
+    def replace(self, new_node: NodeType):
+        """
+        Replace the node in the AST tree with a new node
+        Nodes stored in a dict/list are replaced directly in their parent container,
+        otherwise the replacement is delegated to the `replace_callback`
+        """
+        if self.parent_container is None:
+            self.replace_callback(new_node)
+            return
+
+        self.parent_container[self.parent_key] = new_node
+        self.visitor.modified = True
+        self.parent.modified = True
+
+    def as_child(self, node: NodeType, replace=lambda x: None, container=None, key=None) -> Context:
         return Context(
             parent=self,
             node=node,
+            parent_container=container,
+            parent_key=key,
             depth=self.depth + 1,
             visitor=self.visitor,
-            replace=replace,
+            replace_callback=replace,
             stack=self.stack,
             shared_state=self.shared_state,
             scope_closure=self.scope_closure
         )
 
-    def visit_child(self, node, stack=None, replace=lambda x: None, closure=None):
-        if type(node) in (str, int, type(...)) or node is None or node == ...:
+    def visit_child(self, node, stack=None, replace=lambda x: None, closure=None, container=None, key=None):
+        if type(node) in LEAF_TYPES:
             return
 
-        new_context = self.as_child(node, replace=replace)
+        new_context = self.as_child(node, replace=replace, container=container, key=key)
         if stack is not None:
             new_context.stack = stack
         if closure is not None:
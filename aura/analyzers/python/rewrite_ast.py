@@ -1,30 +1,57 @@
 import codecs
+import typing
 from collections import OrderedDict
+from functools import lru_cache
 
 from .visitor import Visitor
 from .nodes import *
 
 
+@lru_cache(maxsize=64)
+def is_valid_decoder(name: str) -> bool:
+    """
+    Check if the codec with a given name exists
+    The lookups are cached as the set of codecs used in the source code is usually very small
+    """
+    try:
+        codecs.getdecoder(name)
+        return True
+    except LookupError:
+        return False
+
+
 class ASTRewrite(Visitor):
     """
     Visitor to transform the AST tree for deobfuscation purposes
     """
+    # All the mutations are setting the `modified` flag when the tree is changed
+    _needs_convergence_safety = False
+
+    # Mutations are dispatched by the exact type of the visited node
+    # Order of the mutations for the same node type is preserved
+    _DISPATCH = {
+        BinOp: ("binop",),
+        Attribute: ("resolve_variable",),
+        Var: ("resolve_variable",),
+        Subscript: ("resolve_variable", "string_slice"),
+        Call: ("inline_decode", "rewrite_function_call", "replace_string"),
+        dict: ("unary_op",),
+        OrderedDict: ("unary_op",),
+        ReturnStmt: ("return_statement",),
+        Yield: ("return_statement",),
+        YieldFrom: ("return_statement",),
+    }
 
     def __init__(self, **kwargs):
-        self.__mutations = (
-            self.binop,
-            self.resolve_variable,
-            self.string_slice,
-            self.inline_decode,
-            self.rewrite_function_call,
-            self.replace_string,
-            self.unary_op,
-            self.return_statement,
-        )
+        # Bind the mutations once per instance so they are not looked up for every visited node
+        self._dispatch = {
+            node_type: tuple(getattr(self, name) for name in names)
+            for node_type, names in self._DISPATCH.items()
+        }
         super().__init__(**kwargs)
 
     def _visit_node(self, context):
-        for mutation in self.__mutations:
+        for mutation in self._dispatch.get(type(context.node), ()):
             if mutation(context):
                 return
 
@@ -35,18 +62,15 @@ class ASTRewrite(Visitor):
         """
         node = context.node
 
-        if not isinstance(node, BinOp):
-            return
-
         # Lookup variables in a stack
-        if type(node.left) == str:
+        if type(node.left) is str:
             try:
                 node.left = context.stack[node.left]
                 context.visitor.modified = True
             except (TypeError, KeyError):
                 pass
 
-        if type(node.right) == str:
+        if type(node.right) is str:
             try:
                 node.right = context.stack[node.right]
                 context.visitor.modified = True
@@ -54,30 +78,39 @@ class ASTRewrite(Visitor):
                 pass
 
         # Rewrite `Var` pointers to their values they point to
-        if type(node.right) == Var and isinstance(node.right.value, ASTNode):
+        if type(node.right) is Var and isinstance(node.right.value, ASTNode):
             node.right = node.right.value
             context.visitor.modified = True
 
-        if type(node.left) == Var and isinstance(node.left.value, ASTNode):
+        if type(node.left) is Var and isinstance(node.left.value, ASTNode):
             node.left = node.left.value
             context.visitor.modified = True
 
         if node.op == "add":
-            if type(node.left) == String and type(node.right) == String:
-                new_str = str(node.right) + str(node.left)
-                new_node = String(value=new_str)
+            parent = context.parent
+            if parent is not None and type(parent.node) is BinOp and parent.node.op == "add":
+                # Nested operation of a chain only folds its own operands, otherwise each of them would walk the rest of the chain
+                if type(node.left) is String and type(node.right) is String:
+                    leaves = (node.left.value, node.right.value)
+                else:
+                    leaves = None
+            else:
+                # Fold the whole chain of string concatenations at once from its root, e.g. `"a" + "b" + "c"`
+                leaves = self._string_concat_leaves(node)
+            if leaves is not None:
+                new_node = String(value="".join(leaves))
                 new_node.enrich_from_previous(node)
                 context.replace(new_node)
                 return True
-            elif type(node.left) == Number and type(node.right) == Number:
+            elif type(node.left) is Number and type(node.right) is Number:
                 new_node = Number(node.left.value + node.right.value)
                 new_node.enrich_from_previous(node)
                 context.replace(new_node)
                 return True
         elif node.op == "mod":
             try:
-                if type(node.left) == String and type(node.right) == String:
-                    new_str = str(node.right) % str(node.left)
+                if type(node.left) is String and type(node.right) is String:
+                    new_str = str(node.left) % str(node.right)
                     new_node = String(value=new_str)
                     new_node.enrich_from_previous(node)
                     context.replace(new_node)
@@ -86,34 +119,49 @@ class ASTRewrite(Visitor):
                 pass
         # TODO cover other cases
 
-    def string_slice(self, context):
-        if not type(context.node) == Subscript:
-            return
-        elif not type(context.node.value) in (String,):
-            return
+    @staticmethod
+    def _string_concat_leaves(node: BinOp) -> typing.Optional[typing.List[str]]:
+        """
+        Collect in order the string operands of a (nested) string concatenation
+        Return None if any of the operands is not a `String` node
+        """
+        leaves = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if type(current) is BinOp and current.op == "add":
+                stack.append(current.right)
+                stack.append(current.left)
+            elif type(current) is String:
+                leaves.append(current.value)
+            else:
+                return None
 
-        step = context.node.slice.get("step")
-        if type(step) == Number:
-            step = int(step)
-        elif step is not None and type(step) != int:
-            return
+        return leaves
 
-        value = str(context.node.value)
-        lower = context.node.slice.get("lower")
-        if type(lower) == Number:
-            lower = int(lower)
-        elif lower is not None and type(lower) != int:
+    def string_slice(self, context):
+        node = context.node
+        val_node = node.value
+        if type(val_node) is not String:
             return
 
-        upper = context.node.slice.get("upper")
-        if type(upper) == Number:
-            upper = int(upper)
-        elif upper is not None and type(upper) != int:
+        sl = node.slice
+        if type(sl) not in (dict, OrderedDict):
             return
 
-        sliced_str = value[lower:upper:step]
+        bounds = []
+        for name in ("lower", "upper", "step"):
+            bound = sl.get(name)
+            if type(bound) is Number:
+                bound = int(bound)
+            elif bound is not None and type(bound) is not int:
+                return
+            bounds.append(bound)
+
+        lower, upper, step = bounds
+        sliced_str = val_node.value[lower:upper:step]
         new_node = String(sliced_str)
-        new_node.enrich_from_previous(context.node)
+        new_node.enrich_from_previous(node)
         context.replace(new_node)
 
     def resolve_variable(self, context: Context):
@@ -121,16 +169,16 @@ class ASTRewrite(Visitor):
         Transformation for constant propagation
         """
         if (
-            type(context.node) == Attribute
+            type(context.node) is Attribute
         ):
             # Replace attributes such as x.decode("base64") to "test".decode("base64")
             source = context.node.source
 
-            if type(source) == str:
+            if type(source) is str:
                 try:
                     target = context.stack[source]
                     if (
-                        type(target) == Var
+                        type(target) is Var
                         and target.line_no != context.node.line_no
                         and target.var_type == "assign"
                     ):
@@ -140,8 +188,8 @@ class ASTRewrite(Visitor):
                     context.visitor.modified = True
                 except (TypeError, KeyError):
                     return
-        elif (type(context.node) == Subscript):
-            if type(context.node.value) == str:
+        elif (type(context.node) is Subscript):
+            if type(context.node.value) is str:
                 try:
                     target = context.stack[context.node.value]
                 except (TypeError, KeyError):
@@ -151,12 +199,12 @@ class ASTRewrite(Visitor):
                     context.node.value = target
                     context.visitor.modified = True
 
-            elif type(context.node.value) == Var:
+            elif type(context.node.value) is Var:
                 context.node.value = context.node.value.value
                 context.visitor.modified = True
 
-        elif type(context.node) == Var:
-            if type(context.node.value) == str:
+        elif type(context.node) is Var:
+            if type(context.node.value) is str:
                 try:
                     context.node._original = context.node.value
                     context.node.value = context.stack[context.node.value]
@@ -166,28 +214,35 @@ class ASTRewrite(Visitor):
 
     def inline_decode(self, context):
         node = context.node
-        if not type(node) == Call:
-            return
-        elif not (
-            type(node.func) == Attribute
-            and type(node.func.source) in (String, Bytes)
-            and node.func.attr == "decode"
+        func = node.func
+        if not (
+            type(func) is Attribute
+            and type(func.source) in (String, Bytes)
+            and func.attr == "decode"
         ):
             return
 
-        elif not all(type(x) in (String, str) for x in node.args):
-            return
-
-        if len(node.args) > 0:
-            try:
-                _ = codecs.getdecoder(str(node.args[0]))
-            except LookupError:
+        args = []
+        for arg in node.args:
+            arg_type = type(arg)
+            if arg_type is String:
+                args.append(arg.value)
+            elif arg_type is str:
+                args.append(arg)
+            else:
                 return
 
-        args = list(map(str, node.args))
+        if args and not is_valid_decoder(args[0]):
+            return
+
+        source = func.source
+        if type(source) is Bytes:
+            source_bytes = source.value
+        else:
+            source_bytes = source.value.encode("utf-8")
 
-        decoded = codecs.decode(bytes(node.func.source), *args)
-        if type(decoded) == str:
+        decoded = codecs.decode(source_bytes, *args)
+        if type(decoded) is str:
             new_node = String(decoded)
         else:
             new_node = Bytes(decoded)
@@ -196,33 +251,31 @@ class ASTRewrite(Visitor):
         context.replace(new_node)
 
     def rewrite_function_call(self, context):
-        if not isinstance(context.node, Call):
-            return
-
         if (
             context.node.full_name is None
-            and isinstance(context.node.func, Import)
-            and type(context.node._original) == str
+            and type(context.node.func) is Import
+            and type(context.node._original) is str
         ):
             context.node._full_name = context.node.func.names[context.node._original]
+            context.visitor.modified = True
             return True
 
         # Replace call to functions by their targets from defined variables, e.g.
         # x = open
         # x("test.txt") will be replaced to open("test.txt")
         try:
-            if isinstance(context.node.func, Var):
+            if type(context.node.func) is Var:
                 source = context.node._full_name
             else:
                 source = context.node.func
 
             target = context.stack[source]
-            if isinstance(target, Import):
+            if type(target) is Import:
                 name = target.names[source]
             else:
                 name = target.full_name
             if (
-                type(name) == str
+                type(name) is str
                 and context.node._full_name != name
                 and target.line_no != context.node.line_no
             ):
@@ -255,11 +308,11 @@ class ASTRewrite(Visitor):
         # Rewrite call var arguments
         # x(Var(c=10)) -> x(10)
         for idx, arg in enumerate(context.node.args):
-            if type(arg) == Var and arg.var_type == "assign":
+            if type(arg) is Var and arg.var_type == "assign":
                 context.node.args[idx] = arg.value
                 context.visitor.modified = True
 
-        if type(context.node.func) == str and context.node.func in context.stack:
+        if type(context.node.func) is str and context.node.func in context.stack:
             try:
                 context.node._original = context.node.func
                 context.node.func = context.stack[context.node.func]
@@ -270,9 +323,9 @@ class ASTRewrite(Visitor):
 
     def resolve_class(self, context):
         node = context.node
-        if not isinstance(node, Attribute):
+        if type(node) is not Attribute:
             return
-        elif not (type(node.func) == str and node.func == "self"):
+        elif not (type(node.func) is str and node.func == "self"):
             # TODO
             return
 
@@ -295,21 +348,18 @@ class ASTRewrite(Visitor):
               kwargs={}
             )
         """
-        # We are looking for a function call
-        if type(context.node) != Call:
-            return
         # Function target is an attribute with `replace` attribute name
         func: Attribute = context.node.func
-        if not (type(func) == Attribute and func.attr == "replace"):
+        if not (type(func) is Attribute and func.attr == "replace"):
             return
 
         replace_source = func.source
         # Source of the replace must be String
-        if type(replace_source) != String:
+        if type(replace_source) is not String:
             return
 
         # Check that replace args are also strings
-        if len(context.node.args) < 2 or type(context.node.args[0]) != String or type(context.node.args[1]) != String:
+        if len(context.node.args) < 2 or type(context.node.args[0]) is not String or type(context.node.args[1]) is not String:
             return
 
         # Rewrite the node by applying the replace operation
@@ -320,9 +370,7 @@ class ASTRewrite(Visitor):
         context.replace(new_node)
 
     def unary_op(self, context):
-        if not type(context.node) in (dict, OrderedDict):
-            return
-        elif context.node.get("_type") != "UnaryOp":
+        if context.node.get("_type") != "UnaryOp":
             return
 
         if not type(context.node["operand"]) in (Number, int):
@@ -344,14 +392,11 @@ class ASTRewrite(Visitor):
         context.replace(new_node)
 
     def return_statement(self, context):
-        if not isinstance(context.node, ReturnStmt):  # Covers also yield and yield from
-            return
-
         # Try to resolve return constant such as:
         # ...
         # x = 10
         # return x
-        if type(context.node.value) == str:
+        if type(context.node.value) is str:
             try:
                 target = context.stack[context.node.value]
                 context.node.value = target
@@ -361,5 +406,6 @@ class ASTRewrite(Visitor):
 
         # Rewrite variable pointer `ReturnStmt(Var(x=10))` into `ReturnStmt(10)`
         # We don't need the `Var` itself but only the target value it points to
-        if type(context.node.value) == Var and isinstance(context.node.value.value, ASTNode):
+        if type(context.node.value) is Var and isinstance(context.node.value.value, ASTNode):
             context.node.value = context.node.value.value
+            context.visitor.modified = True
@@ -28,20 +28,20 @@ class SQLi(base.NodeAnalyzerV2):
         Query:
         "SELECT * FROM users WHERE id = %d" % uid
         AST:
-        BinOp(op='mod', left='uid', right=String(value='SELECT * FROM users WHERE id = %d'))
+        BinOp(op='mod', left=String(value='SELECT * FROM users WHERE id = %d'), right='uid')
 
         and
 
         "SELECT * FROM users where id = " + uid
         AST:
-        BinOp(op='add', left='uid', right=String(value='SELECT * FROM users where id = '))
+        BinOp(op='add', left=String(value='SELECT * FROM users where id = '), right='uid')
         """
         n = context.node
         yield from []
-        if not (isinstance(n.right, String) and n.op in ("mod", "add")):
+        if not (isinstance(n.left, String) and n.op in ("mod", "add")):
             return
 
-        if not is_sql(n.right.value):
+        if not is_sql(n.left.value):
             return
 
         yield Detection(
@@ -4,26 +4,33 @@ This module contains Visitor class for traversing the parsed AST tree
 from __future__ import annotations
 
 import os
+import sys
 import time
-from functools import partial, wraps
-from collections import deque, OrderedDict
+import json
+import hashlib
+from functools import wraps
+from collections import OrderedDict
 from warnings import warn
 from typing import Optional, Tuple, Union, Dict
 
-import pkg_resources
-
-from .nodes import Context, ASTNode
+from .nodes import Context, ASTNode, LEAF_TYPES
 from ..detections import Detection
 from ...stack import CallGraph
 from .. import python_src_inspector
 from ...uri_handlers.base import ScanLocation
 from ...exceptions import ASTParseError
+from ...cache import Cache
 from ... import python_executor
 from ... import config
+from ... import __version__
 
 
 INSPECTOR_PATH = os.path.abspath(python_src_inspector.__file__)
 VISITORS = None
+# Values under these keys are repeated a lot throughout the AST tree so they are interned
+INTERNED_KEYS = frozenset(("_type", "attr", "action", "id", "func", "name"))
+# Maximum size of the source code file for it's AST tree to be cached
+AST_CACHE_MAX_FILE_SIZE = 1024 ** 2
 
 logger = config.get_logger(__name__)
 
@@ -43,6 +50,68 @@ def ignore_error(func):
     return wrapper
 
 
+def get_ast_cache_key(location: ScanLocation, metadata: dict) -> Optional[tuple]:
+    """
+    Compute the key for caching the parsed AST tree of the location
+    Key is composed of the hash of the file content rather than it's path as archives and remote sources
+    are extracted into a different temporary location on each scan, None is returned if the file can't be cached
+    """
+    try:
+        if os.stat(location.str_location).st_size > AST_CACHE_MAX_FILE_SIZE:
+            return None
+
+        with open(location.str_location, "rb") as fd:
+            digest = hashlib.sha256(fd.read()).hexdigest()
+    except OSError:
+        return None
+
+    return (__version__, digest, metadata.get("interpreter_path"))
+
+
+def load_cached_ast_tree(cache_key: tuple, metadata: dict) -> Optional[dict]:
+    data = Cache.load_ast_tree(cache_key)
+    if data is None:
+        return None
+
+    try:
+        entry = json.loads(data)
+    except ValueError:
+        logger.exception("Could not load the cached AST tree")
+        return None
+
+    for key in ("interpreter_name", "interpreter_path"):
+        if entry.get(key) is not None:
+            metadata[key] = entry[key]
+
+    return entry["tree"]
+
+
+def intern_tree(tree, _intern=sys.intern, _type=type, _dict=dict, _list=list, _str=str):
+    """
+    Intern the repeated string values in the parsed AST tree in place
+    This turns most of the string comparisons during the tree traversal into a pointer comparison and lowers the memory usage
+    Dict keys are left as is, they are already shared by the JSON decoder
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        node_type = _type(node)
+        if node_type is _dict:
+            for key, value in node.items():
+                value_type = _type(value)
+                if value_type is _str:
+                    if key in INTERNED_KEYS:
+                        # Replacing the value of an existing key doesn't change the dict size so it's safe while iterating
+                        node[key] = _intern(value)
+                elif value_type is _dict or value_type is _list:
+                    stack.append(value)
+        elif node_type is _list:
+            for x in node:
+                value_type = _type(x)
+                if value_type is _dict or value_type is _list:
+                    stack.append(x)
+
+
 def get_ast_tree(location: Union[ScanLocation, bytes], metadata=None) -> dict:
     if type(location) == bytes:
         kwargs = {
@@ -60,14 +129,35 @@ def get_ast_tree(location: Union[ScanLocation, bytes], metadata=None) -> dict:
         else:
             metadata = {}
 
-    tree = python_executor.run_with_interpreters(
-        metadata=metadata,
-        native_callback=python_executor.get_native_source_code,
-        **kwargs
-    )
+    cache_key = None
+    if type(location) != bytes:
+        cache_key = get_ast_cache_key(location, metadata)
+
+    tree = None
+    if cache_key is not None:
+        tree = load_cached_ast_tree(cache_key, metadata)
 
     if tree is None:
-        raise ASTParseError("Unable to parse the source code")
+        tree = python_executor.run_with_interpreters(
+            metadata=metadata,
+            native_callback=python_executor.get_native_source_code,
+            **kwargs
+        )
+
+        if tree is None:
+            raise ASTParseError("Unable to parse the source code")
+
+        if cache_key is not None:
+            try:
+                data = json.dumps({
+                    "tree": tree,
+                    "interpreter_name": metadata.get("interpreter_name"),
+                    "interpreter_path": metadata.get("interpreter_path"),
+                }).encode()
+            except (TypeError, ValueError):  # Tree contains values that can't be stored as JSON
+                logger.debug(f"AST tree of {location} can't be serialized, skipping the cache")
+            else:
+                Cache.save_ast_tree(cache_key, data)
 
     if "encoding" not in metadata and tree and tree.get("encoding"):
         metadata["encoding"] = tree["encoding"]
@@ -75,7 +165,6 @@ def get_ast_tree(location: Union[ScanLocation, bytes], metadata=None) -> dict:
     return tree
 
 
-
 class Visitor:
     """
     Main class for traversing the parsed AST tree with support for hooks to call functions
@@ -83,6 +172,8 @@ class Visitor:
     """
 
     stage_name = None
+    # Visitors that are known to always set the `modified` flag don't need the extra convergence passes
+    _needs_convergence_safety = True
 
     def __init__(self, *, location: ScanLocation):
         self.location: ScanLocation = location
@@ -90,15 +181,25 @@ class Visitor:
         self.traversed = False
         self.modified = False
         self.iteration = 0
-        self.convergence = 1
-        self.queue = deque()
+        if self._needs_convergence_safety:
+            self._convergence_passes = int(config.get_settings("aura.visitor-convergence", 1))
+        else:
+            self._convergence_passes = 0
+        self.convergence = self._convergence_passes
+        # FIFO queue of contexts to process, `_qhead` points to the next context to be processed
+        self.queue: list = []
+        self._qhead = 0
         self.call_graph = CallGraph()
 
         self.hits = []
         self.path = location.location
         self.normalized_path: str = str(location)
+        # Breakpoints on debug lines are checked only if enabled as it's a lookup for every visited node
+        self._debug = config.DEBUG_ENABLED
         self.max_iterations = int(config.get_settings("aura.max-ast-iterations", 500))
         self.max_queue_size = int(config.get_settings("aura.max-ast-queue-size", 10000))
+        # ID's of the nodes processed in the current pass, cleared at the start of every pass
+        self._processed_nodes = set()
 
     @classmethod
     def from_visitor(cls, visitor: Visitor) -> Visitor:
@@ -119,6 +220,7 @@ class Visitor:
             previous.load_tree()
         else:
             previous.tree = ast_tree
+            intern_tree(previous.tree)
         previous.traverse()
 
         visitors = cls.get_visitors()
@@ -141,29 +243,21 @@ class Visitor:
         if VISITORS is None:
             VISITORS = {
                 x.name: x.load()
-                for x in pkg_resources.iter_entry_points("aura.ast_visitors")
+                for x in config.iter_entry_points("aura.ast_visitors")
             }
 
         return VISITORS
 
     def load_tree(self):
         self.tree = get_ast_tree(self.location)
+        intern_tree(self.tree)
 
     def push(self, context):
-        if len(self.queue) >= self.max_queue_size:
+        if len(self.queue) - self._qhead >= self.max_queue_size:
             warn("AST Queue size exceeded, dropping traversal node", stacklevel=2)
             return False
         self.queue.append(context)
 
-    def _replace_generic(self, new_node, key, context):
-        """
-        This is a very simple helper that only sets dict/list value
-        It's used in a combination of functools.partial to free some of it's arguments
-        """
-        self.modified = True
-        context.modified = True
-        context.node[key] = new_node
-
     def _replace_root(self, new_node):
         """
         Helper function to replace the root in a context call
@@ -184,6 +278,7 @@ class Visitor:
 
         while self.iteration == 0 or self.modified or self.convergence:
             self.queue.clear()
+            self._qhead = 0
             if self.convergence is not None:
                 # Convergence attribute defines how many extra passes through the tree are made
                 # after it was not modified, this is a safety mechanism as some badly
@@ -193,7 +288,11 @@ class Visitor:
                     self.convergence -= 1
                 else:
                     # Reset convergence if the tree was modified
-                    self.convergence = 1
+                    self.convergence = self._convergence_passes
+
+            # Every pass, including the convergence passes, is a full walk of the tree
+            # Processed nodes are tracked only within the pass to prevent the infinite loops
+            self._processed_nodes.clear()
 
             self.modified = False
 
@@ -202,23 +301,25 @@ class Visitor:
                 root = root["ast_tree"]
 
             new_ctx = Context(
-                node=root, parent=None, replace=self._replace_root, visitor=self
+                node=root, parent=None, replace_callback=self._replace_root, visitor=self
             )
             self.queue.append(new_ctx)
             self._init_visit(new_ctx)
-            processed_nodes = set()
+            processed_nodes = self._processed_nodes
 
-            while self.queue:
-                ctx: Context = self.queue.popleft()
+            while self._qhead < len(self.queue):
+                ctx: Context = self.queue[self._qhead]
+                self._qhead += 1
 
                 # Keep track of processed object ID's
                 # This is to prevent infinite loops where processed object will add themselves back to queue
-                # This works on python internal ID as we are only concerned about the same objects
-                if _id(ctx.node) in processed_nodes:
+                # Tracking is done by python internal ID as we are only concerned about the same objects
+                node_id = _id(ctx.node)
+                if node_id in processed_nodes:
                     continue
 
                 self.__process_context(ctx)
-                processed_nodes.add(_id(ctx.node))
+                processed_nodes.add(node_id)
 
             self._post_iteration()
             self.iteration += 1
@@ -261,39 +362,33 @@ class Visitor:
         if context.modified:
             return
 
-        # Using map is much faster then for-loop
-        if _type(context.node) in (_dict, OrderedDict):
-            if context.node.get("lineno") in config.DEBUG_LINES:
+        node = context.node
+        if _type(node) in (_dict, OrderedDict):
+            if self._debug and node.get("lineno") in config.DEBUG_LINES:
                 breakpoint()
-            keys = _list(k for k, v in context.node.items() if type(v) not in (str, int))
-            _list(map(lambda k: self.__visit_dict(k, context), keys))
-        elif _type(context.node) == _list:
-            _list(map(lambda x: self.__visit_list(x[0], x[1], context), enumerate(context.node)))
-        elif _isinstance(context.node, ASTNode):
-            if context.node.line_no in config.DEBUG_LINES:
-                breakpoint()
-
-            if not context.node.converged:
-                context.node._visit_node(context)
 
-    def __visit_dict(self, key: str, context: Context):
-        value = context.node[key]
-
-        if type(value) == dict and len(value) == 1 and value.get("_type") == "Load":
-            return
-        elif type(value) in (tuple, list) and len(value) == 0:
-            return
+            # Children are only pushed to the queue here and replaced later when processed
+            # Keys are never added or removed from the dict so it's safe to iterate it without a copy
+            for key, value in node.items():
+                value_type = _type(value)
+                if value_type in LEAF_TYPES:
+                    continue
+                elif value_type == _dict and len(value) == 1 and value.get("_type") == "Load":
+                    continue
+                elif value_type in (tuple, _list) and len(value) == 0:
+                    continue
 
-        context.visit_child(
-            node=context.node[key],
-            replace=partial(self._replace_generic, key=key, context=context),
-        )
+                context.visit_child(node=value, container=node, key=key)
+        elif _type(node) == _list:
+            for idx, item in enumerate(node):
+                if _type(item) not in LEAF_TYPES:
+                    context.visit_child(node=item, container=node, key=idx)
+        elif _isinstance(node, ASTNode):
+            if self._debug and node.line_no in config.DEBUG_LINES:
+                breakpoint()
 
-    def __visit_list(self, idx: int, item, context: Context):
-        context.visit_child(
-            node=item,
-            replace=partial(self._replace_generic, key=idx, context=context),
-        )
+            if not node.converged:
+                node._visit_node(context)
 
     def _init_visit(self, context: Context):
         pass
@@ -13,6 +13,9 @@ logger = config.get_logger(__name__)
 class Cache:
     DISABLE_CACHE = bool(os.environ.get("AURA_NO_CACHE"))
     __location: Optional[Path] = None
+    # Eviction scans the whole cache directory so it runs only on every Nth saved AST tree
+    AST_EVICTION_INTERVAL = 256
+    __ast_tree_saves = 0
 
     @classmethod
     def get_location(cls) -> Optional[Path]:
@@ -115,3 +118,72 @@ class Cache:
         except Exception as exc:
             cache_path.unlink(missing_ok=True)
             raise exc
+
+    @classmethod
+    def load_ast_tree(cls, cache_key: tuple) -> Optional[bytes]:
+        """
+        Retrieve the JSON serialized AST tree stored under the cache key
+        """
+        if cls.get_location() is None:  # Caching is disabled
+            return None
+
+        cache_path: Path = cls.get_location() / cls._ast_tree_cache_id(cache_key)
+        try:
+            data = cache_path.read_bytes()
+        except OSError:
+            return None
+
+        logger.debug(f"Loading AST tree {cache_path.name} from cache")
+        # Modification time marks the last use of the entry for the eviction
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return data
+
+    @classmethod
+    def save_ast_tree(cls, cache_key: tuple, data: bytes):
+        if cls.get_location() is None:  # Caching is disabled
+            return
+
+        cache_id = cls._ast_tree_cache_id(cache_key)
+        cache_path: Path = cls.get_location() / cache_id
+        tmp_path = cache_path.with_name(f"{cache_id}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            tmp_path.replace(cache_path)
+        except Exception:
+            logger.exception(f"Could not save AST tree {cache_id} to cache")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        if cls.__ast_tree_saves % cls.AST_EVICTION_INTERVAL == 0:
+            cls.evict_ast_trees()
+        cls.__ast_tree_saves += 1
+
+    @classmethod
+    def evict_ast_trees(cls):
+        """
+        Remove the least recently used AST trees from the cache above the configured maximum number of entries
+        """
+        if cls.get_location() is None:  # Caching is disabled
+            return
+
+        max_entries = int(config.get_settings("aura.ast-cache-entries", 4096))
+        entries = []
+        for x in cls.get_location().glob("asttree_*"):
+            try:
+                entries.append((x.stat().st_mtime_ns, x))
+            except OSError:  # Removed by another process in the meantime
+                continue
+
+        if len(entries) <= max_entries:
+            return
+
+        entries.sort()
+        for _, x in entries[:len(entries) - max_entries]:
+            x.unlink(missing_ok=True)
+
+    @staticmethod
+    def _ast_tree_cache_id(cache_key: tuple) -> str:
+        return f"asttree_{hashlib.sha256(repr(cache_key).encode()).hexdigest()}"
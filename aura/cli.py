@@ -45,7 +45,7 @@ def scan_help_text():
 @click.pass_context
 def cli(ctx, **kwargs):
     """Package security aura project"""
-    pass
+    config.apply_runtime_limits()
 
 
 @cli.command(name="scan", help=scan_help_text())
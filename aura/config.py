@@ -1,20 +1,18 @@
 # coding=utf-8
 import os
 import sys
+import copy
 import typing
 import time
 import resource
 import logging
 import warnings
-import concurrent.futures
-from importlib import resources
+from importlib import resources, metadata
 from pathlib import Path
 from functools import lru_cache
 from logging.handlers import RotatingFileHandler
 from typing import Optional, Generator
 
-import tqdm
-import pkg_resources
 import ruamel.yaml
 from ruamel.yaml import composer
 try:
@@ -30,6 +28,7 @@ CFG_PATH = None
 SEMANTIC_RULES: Optional[dict] = None
 LOG_FMT = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 LOG_ERR = None
+RUNTIME_LIMITS_APPLIED = False
 # This is used to trigger breakpoint during AST traversing of specific lines
 DEBUG_LINES = set()
 DEFAULT_AST_STAGES = ("convert", "rewrite", "ast_pattern_matching", "taint_analysis", "readonly")
@@ -43,6 +42,8 @@ DEFAULT_SIGNATURE_PATH = "aura.data.signatures.yaml"
 if "AURA_DEBUG_LINES" in os.environ:
     DEBUG_LINES = set(int(x.strip()) for x in os.environ["AURA_DEBUG_LINES"].split(","))
 
+DEBUG_ENABLED: bool = bool(DEBUG_LINES)
+
 
 # Check if the log file can be created otherwise it will crash here
 if os.access("aura_errors.log", os.W_OK):
@@ -66,6 +67,8 @@ class TqdmLoggingHandler(logging.Handler):
     def emit(self, record):
         try:
             msg = self.format(record)
+            import tqdm  # Imported lazily as it's needed only when there is something to log
+
             tqdm.tqdm.write(msg, file=sys.stderr)
             self.flush()
         except (KeyboardInterrupt, SystemExit):
@@ -185,9 +188,22 @@ def get_file_content(location: str, base_path: Optional[str]=None) -> str:
             return fd.read()
 
 
-def parse_config(pth, default_pth) -> dict:
-    logger.debug(f"Aura configuration located at {pth}")
+def get_file_mtime(location: str) -> Optional[int]:
+    """
+    Return modification time of the configuration file, `None` for the files bundled as aura resources
+    """
+    if location.startswith("aura.data."):
+        return None
+
+    try:
+        return os.stat(location).st_mtime_ns
+    except OSError:
+        return None
 
+
+@lru_cache()
+def _parse_config_cached(pth, default_pth, mtime: Optional[int], default_mtime: Optional[int]) -> dict:
+    # mtimes are part of the cache key so the file is parsed again only after it has been modified
     content = get_file_content(pth)
     if content.startswith("---"):
         default_cfg = get_file_content(default_pth)
@@ -198,7 +214,18 @@ def parse_config(pth, default_pth) -> dict:
         return ruamel.yaml.safe_load(content)
 
 
+def parse_config(pth, default_pth) -> dict:
+    logger.debug(f"Aura configuration located at {pth}")
+    parsed = _parse_config_cached(pth, default_pth, get_file_mtime(pth), get_file_mtime(default_pth))
+    # Return a copy so the cached document can't be modified by the caller
+    return copy.deepcopy(parsed)
+
+
 def load_config():
+    """
+    Parse the aura configuration and semantic rules into the module level `CFG` and `SEMANTIC_RULES`
+    This has no other side effects, runtime limits are applied separately via `apply_runtime_limits`
+    """
     global SEMANTIC_RULES, CFG, CFG_PATH
 
     CFG_PATH = str(find_configuration())
@@ -211,33 +238,49 @@ def load_config():
 
     SEMANTIC_RULES = parse_config(semantic_sig_pth, DEFAULT_SIGNATURE_PATH)
 
+
+def apply_runtime_limits(cfg: Optional[dict] = None):
+    """
+    Configure logging, warnings, rlimits and recursion limit of the process as defined in the aura configuration
+    This is called by the CLI entry point rather than at import so that importing aura as a library has no process wide side effects
+    """
+    global RUNTIME_LIMITS_APPLIED
+
+    if RUNTIME_LIMITS_APPLIED:
+        return
+
+    if cfg is None:
+        cfg = CFG
+
     if "AURA_LOG_LEVEL" in os.environ:
         log_level = logging.getLevelName(os.getenv("AURA_LOG_LEVEL").upper())
     else:
         log_level = logging.getLevelName(
-            CFG["aura"].get("log-level", "warning").upper()
+            cfg["aura"].get("log-level", "warning").upper()
         )
 
     configure_logger(log_level)
 
     if not sys.warnoptions:
-        w_filter = CFG["aura"].get("warnings", "default")
+        w_filter = cfg["aura"].get("warnings", "default")
         warnings.simplefilter(w_filter)
         os.environ["PYTHONWARNINGS"] = w_filter
 
-    rss = CFG["aura"].get("rlimit-memory")
+    rss = cfg["aura"].get("rlimit-memory")
     if rss:
         resource.setrlimit(resource.RLIMIT_RSS, (rss, rss))
 
-    fsize = CFG["aura"].get("rlimit-fsize")
+    fsize = cfg["aura"].get("rlimit-fsize")
     if fsize:
         resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
 
-    rec_limit = os.environ.get("AURA_RECURSION_LIMIT") or CFG["aura"].get("python-recursion-limit")
+    rec_limit = os.environ.get("AURA_RECURSION_LIMIT") or cfg["aura"].get("python-recursion-limit")
 
     if rec_limit:
         sys.setrecursionlimit(int(rec_limit))
 
+    RUNTIME_LIMITS_APPLIED = True
+
 
 def get_pypi_stats_path() -> Path:
     pth = os.environ.get("AURA_PYPI_STATS", None) or CFG["aura"]["pypi_stats"]
@@ -272,8 +315,22 @@ def get_default_tag_filters() -> typing.List[str]:
     return tags
 
 
+def iter_entry_points(group: str) -> typing.Iterable[metadata.EntryPoint]:
+    """
+    Lookup installed entry points for the given group using `importlib.metadata`
+    This avoids importing `pkg_resources` which is expensive at startup
+
+    :param group: name of the entry points group, for example `aura.ast_visitors`
+    :return: iterable of entry points
+    """
+    eps = metadata.entry_points()
+    if hasattr(eps, "select"):  # Python 3.10+
+        return eps.select(group=group)
+    return eps.get(group, ())
+
+
 def get_installed_stages() -> typing.Generator[str,None,None]:
-    for x in pkg_resources.iter_entry_points("aura.ast_visitors"):
+    for x in iter_entry_points("aura.ast_visitors"):
         yield x.name
 
 
@@ -288,8 +345,8 @@ def get_ast_patterns() -> tuple:
 
     if AST_PATTERNS_CACHE is None:
         start = time.monotonic()
-        with concurrent.futures.ThreadPoolExecutor() as e:
-            AST_PATTERNS_CACHE = tuple(e.map(ASTPattern, SEMANTIC_RULES.get("patterns", [])))
+        # Compilation is a pure python CPU work so it's not parallelized
+        AST_PATTERNS_CACHE = tuple(ASTPattern(x) for x in SEMANTIC_RULES.get("patterns", []))
         elapsed = round(time.monotonic() - start, 5)
         logger.debug(f"AST Pattern compilation took {elapsed}s")
     return AST_PATTERNS_CACHE
@@ -6,8 +6,7 @@ from dataclasses import dataclass, field
 from urllib import parse
 from typing import List, Union, Mapping, Optional, Iterable
 
-import pkg_resources
-
+from .. import config
 from .. import exceptions
 from ..type_definitions import DiffType, DiffAnalyzerType
 
@@ -38,7 +37,7 @@ class OutputBase(metaclass=ABCMeta):
         handlers = OUTPUT_HANDLER_CACHE.setdefault(cls.entrypoint(), {})
 
         if not handlers:
-            for x in pkg_resources.iter_entry_points(cls.entrypoint()):
+            for x in config.iter_entry_points(cls.entrypoint()):
                 handler = x.load()
                 handlers[x.name] = handler
 
@@ -123,4 +123,5 @@ class Table:
             preport.align(" \u2502 ".join(cols))
 
         preport.print_bottom_separator()
+        preport.flush()
 
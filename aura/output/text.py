@@ -2,14 +2,15 @@ import re
 import os
 import sys
 import itertools
+from functools import lru_cache
 from shutil import get_terminal_size
 from dataclasses import dataclass
-from textwrap import wrap
+from textwrap import TextWrapper
 from prettyprinter import pformat
 from typing import Optional, Any, Generator
 from collections import Counter
 
-from click import secho, style
+from click import echo, secho, style
 
 from .. import utils
 from .. import config
@@ -54,20 +55,33 @@ SEVERITY_COLORS = {
 }
 
 
+# Colors of unified diff lines by their first character, lines starting with `@` can only be the `@@` hunk headers
+DIFF_LINE_COLORS = {
+    "@": "bright_blue",
+    "+": "bright_green",
+    "-": "bright_red",
+}
+
+
 OK = '\u2713'
 NOK = '\u2717'
 
 TTY_COLORS = bool(os.environ.get("AURA_FORCE_COLORS", False)) or None
 
+# ANSI escape sequence: literal ESC, literal [, zero or more digits or semicolons and a letter
+_ANSI_RE = re.compile(r"\x1b\[[;\d]*[A-Za-z]")
+
+
+@lru_cache(maxsize=1024)
+def _styled(text: str, fg: Optional[str]=None, bold: Optional[bool]=None) -> str:
+    """
+    Cached `click.style` for the strings that repeat across detections such as types, scores or headings
+    """
+    return style(text, fg=fg, bold=bold)
 
 
 class PrettyReport:
-    ANSI_RE = re.compile(r"""
-    (\x1b     # literal ESC
-    \[       # literal [
-    [;\d]*   # zero or more digits or semicolons
-    [A-Za-z]) # a letter
-    """, re.VERBOSE)
+    ANSI_RE = _ANSI_RE
 
     def __init__(self, fd=None):
         self.term_width = get_terminal_size(fallback=(120, 24))[0]
@@ -82,16 +96,67 @@ class PrettyReport:
                 self.width = int(width or 120)
 
         self.fd = fd
+        # Width available for the content between the default box borders used by `align`
+        self._remaining_len = self.width - 4
+        # Output lines are buffered and written out at once by `flush` to avoid a write call per line
+        self._buf = []
+        # Separators and paddings are repeated for every line, keep the built strings for reuse
+        self._fill_cache = {}
+        self._separator_lines = {}
+        # TextWrapper instances reused for each width
+        self._wrappers = {}
 
     @classmethod
     def ansi_length(cls, line:str):
-        return len(cls.ANSI_RE.sub("", line))
+        # Most of the lines are not styled, skip the regex engine entirely for them
+        if "\x1b" not in line:
+            return len(line)
+
+        return len(line) - sum(m.end() - m.start() for m in _ANSI_RE.finditer(line))
+
+    def flush(self):
+        if not self._buf:
+            return
+
+        data = "\n".join(self._buf) + "\n"
+        self._buf.clear()
+        fd = self.fd if self.fd is not None else sys.stdout
+
+        # Keep the click code path on Windows where it takes care of the console colors initialization
+        if os.name == "nt":
+            echo(data, file=fd, color=TTY_COLORS, nl=False)
+            return
+
+        # Same as click, strip the styles unless the colors are forced or writing to a terminal
+        if not TTY_COLORS and not (hasattr(fd, "isatty") and fd.isatty()):
+            data = _ANSI_RE.sub("", data)
+
+        buffer = getattr(fd, "buffer", None)
+        if buffer is None:
+            fd.write(data)
+            fd.flush()
+        else:
+            fd.flush()  # Text layer could still contain data written directly to the `fd`
+            buffer.write(data.encode(fd.encoding or "utf-8", fd.errors or "strict"))
+            buffer.flush()
+
+    def fill(self, char: str, length: int) -> str:
+        key = (char, length)
+        filled = self._fill_cache.get(key)
+        if filled is None:
+            filled = self._fill_cache[key] = char * length
+        return filled
 
     def print_separator(self, sep="\u2504", left="\u251C", right="\u2524", width=None):
         if width is None:
             width = self.width
 
-        secho(f"{left}{sep*(width-2)}{right}", file=self.fd, color=TTY_COLORS)
+        key = (left, sep, right, width)
+        line = self._separator_lines.get(key)
+        if line is None:
+            line = self._separator_lines[key] = f"{left}{self.fill(sep, width-2)}{right}"
+
+        self._buf.append(line)
 
     def print_thick_separator(self):
         self.print_separator(left="\u255E", sep="\u2550", right="\u2561")
@@ -109,24 +174,42 @@ class PrettyReport:
         text_len = self.ansi_length(text)
         ljust = (width - text_len) // 2
         rjust = width - text_len - ljust
-        return f"{left}{infill*ljust} {text} {infill*rjust}{right}"
+        return f"{left}{self.fill(infill, ljust)} {text} {self.fill(infill, rjust)}{right}"
 
     def print_heading(self, *args, **kwargs):
-        secho(self.generate_heading(*args, **kwargs), file=self.fd, color=TTY_COLORS)
+        self._buf.append(self.generate_heading(*args, **kwargs))
+
+    def _align_fast(self, line):
+        self._buf.append(f"\u2502 {line}{self.fill(' ', self._remaining_len - len(line))} \u2502")
 
     def align(self, line, pos=-1, left="\u2502 ", right=" \u2502", width=None):
+        # Most of the lines are unstyled, fit into the default box and don't need the generic alignment
+        if (
+                pos == -1 and width is None and left == "\u2502 " and right == " \u2502"
+                and "\x1b" not in line and len(line) <= self._remaining_len
+        ):
+            return self._align_fast(line)
+
         if width is None:
             width = self.width
         line = self._align_text(line, width - len(left) - len(right), pos=pos)
-        secho(f"{left}{line}{right}", file=self.fd, color=TTY_COLORS)
+        self._buf.append(f"{left}{line}{right}")
 
     def wrap(self, text, left="\u2502 ", right=" \u2502"):
         remaining_len=self.width - len(left) - len(right)
-        for line in wrap(text, width=remaining_len):
+        wrapper = self._wrappers.get(remaining_len)
+        if wrapper is None:
+            wrapper = self._wrappers[remaining_len] = TextWrapper(width=remaining_len)
+
+        for line in wrapper.wrap(text):
             self.align(line, left=left, right=right)
 
     def pformat(self, obj, left="\u2502 ", right=" \u2502"):
         remaining_len = self.width - len(left) - len(right)
+        # Most of the detections have no extra data, prettyprinter is not needed for them
+        if type(obj) is dict and not obj:
+            return self.align("{}", left=left, right=right)
+
         for line in pformat(obj, width=remaining_len).splitlines(False):
             self.align(line, left=left, right=right)
 
@@ -136,20 +219,31 @@ class PrettyReport:
         overflow = content_len - remaining_len
 
         if content_len > remaining_len:
-            parts = self.ANSI_RE.split(text)[::-1]
-            for idx, x in enumerate(parts):
-                if x.startswith(r"\x1b"):
-                    continue
-                if len(x) > overflow:
-                    parts[idx] = x[:-overflow-6] + " [...]"
-                    break
-
-            text = "".join(parts[::-1])
+            text = self._truncate(text, overflow)
 
+        padding = self.fill(" ", remaining_len - content_len)
         if pos == -1:
-            return text + " " * (remaining_len - content_len)
+            return text + padding
         else:
-            return " " * (remaining_len - content_len) + text
+            return padding + text
+
+    @staticmethod
+    def _truncate(text: str, overflow: int) -> str:
+        """
+        Shorten the longest part of the text that is not an ANSI escape sequence by `overflow` characters
+        """
+        start = end = pos = 0
+        if "\x1b" in text:
+            for m in _ANSI_RE.finditer(text):
+                if m.start() - pos > end - start:
+                    start, end = pos, m.start()
+                pos = m.end()
+
+        if len(text) - pos > end - start:
+            start, end = pos, len(text)
+
+        cut = max(end - overflow - 6, start)
+        return text[:cut] + " [...]" + text[end:]
 
     def print_tables(self, *tables):
         table_widths = [t.width+2 for t in tables]
@@ -177,6 +271,7 @@ class PrettyReport:
                 self.print_thick_separator()
 
         self.print_bottom_separator()
+        self.flush()
 
 
 
@@ -188,6 +283,15 @@ class TextBase:
     def protocol(cls) -> str:
         return "text"
 
+    @property
+    def formatter(self) -> PrettyReport:
+        """
+        PrettyReport of this output instance, created on the first use so each output has its own buffer and caches
+        """
+        if self._formatter is None:
+            self._formatter = PrettyReport(fd=getattr(self, "_fd", None))
+        return self._formatter
+
     def _format_detection(
             self,
             hit,
@@ -196,37 +300,48 @@ class TextBase:
             top_separator=True,
             bottom_separator=True
     ):
-        out = self._formatter
+        out = self.formatter
+        align = out.align
+        separator = out.print_separator
+
+        get = hit.get
+        line_no = get("line_no")
+        location = get("location")
+        line = get("line")
+
         if top_separator:
             out.print_top_separator()
 
         if header is None:
-            header = style(hit["type"], "green", bold=True)
-            color = SEVERITY_COLORS[hit["severity"]]
-            header += style(f" / {hit['severity'].capitalize()} severity", fg=color)
+            severity = hit["severity"]
+            header = _styled(hit["type"], "green", bold=True)
+            header += _styled(f" / {severity.capitalize()} severity", fg=SEVERITY_COLORS[severity])
         out.print_heading(header)
 
-        out.print_separator()
+        separator()
         out.wrap(hit["message"])
-        out.print_separator()
+        separator()
 
-        if hit.get('line_no') or hit.get('location'):
-            line_info = f"Line {style(str(hit.get('line_no', 'N/A')), 'blue', bold=True)}"
-            line_info += f" at {style(hit['location'], 'blue', bold=True)}"
-            out.align(line_info)
+        if line_no or location:
+            # Line numbers and locations rarely repeat, they are styled without the cache
+            line_info = f"Line {style('N/A' if line_no is None else str(line_no), 'blue', bold=True)}"
+            line_info += f" at {style('N/A' if location is None else str(location), 'blue', bold=True)}"
+            align(line_info)
 
-        if hit.get('line'):
-            out.align(style(hit["line"], "cyan"))
-        out.print_separator()
+        if line:
+            align(style(line, "cyan"))
+        separator()
 
-        score = f"Score: {style(str(hit['score']), 'blue', bold=True)}"
-        if hit.get('informational'):
+        score = f"Score: {_styled(str(hit['score']), 'blue', bold=True)}"
+        if get("informational"):
             score += ", informational"
-        out.align(score)
+        align(score)
 
-        out.align(f"Tags: {', '.join(hit.get('tags', []))}")
-        out.align("Extra:")
-        out.pformat(hit.get('extra', {}))
+        tags = get("tags")
+        if tags:
+            align(f"Tags: {', '.join(tags)}")
+        align("Extra:")
+        out.pformat(get("extra", {}))
         if bottom_separator:
             out.print_bottom_separator()
 
@@ -234,23 +349,26 @@ class TextBase:
         """
         pretty print the module tree
         """
-        last = len(tree) - 1
-        for ix, x in enumerate(tree.keys()):
-            subitems = tree.get(x, {})
-
-            # https://en.wikipedia.org/wiki/Box-drawing_character
-            char = ""
-            if ix == last:
-                char += "└"
-            elif ix == 0:
-                char += "┬"
+        # Traversed using an explicit stack of (children iterator, index of last child, indent) for each level
+        stack = [(enumerate(tree.items()), len(tree) - 1, indent)]
+        while stack:
+            children, last, indent = stack[-1]
+            for ix, (x, subitems) in children:
+                # https://en.wikipedia.org/wiki/Box-drawing_character
+                if ix == last:
+                    char = "└"
+                elif ix == 0:
+                    char = "┬"
+                else:
+                    char = "├"
+
+                yield "".join((indent, char, " ", _styled(x, fg="bright_blue")))
+                if subitems:
+                    new_indent = " " if ix == last else "│"
+                    stack.append((enumerate(subitems.items()), len(subitems) - 1, indent + new_indent))
+                    break
             else:
-                char += "├"
-
-            yield f"{indent}{char} {style(x, fg='bright_blue')}"
-            if subitems:
-                new_indent = " " if ix == last else "│"
-                yield from self.pprint_imports(subitems, indent + new_indent)
+                stack.pop()
 
     def imports_to_tree(self, items: list) -> dict:
         """
@@ -258,17 +376,14 @@ class TextBase:
         """
         root = {}
         for x in items:
-            parts = x.split(".")
             current = root
-            for x in parts:
-                if x not in current:
-                    current[x] = {}
-                current = current[x]
+            for part in x.split("."):
+                current = current.setdefault(part, {})
 
         return root
 
     def output_table(self, table: Table):
-        out = PrettyReport(fd=self._fd)
+        out = self.formatter
         out.print_top_separator()
 
         if table.metadata.get("title"):
@@ -283,6 +398,7 @@ class TextBase:
             out.align(" \u2502 ".join(cols))
 
         out.print_bottom_separator()
+        out.flush()
 
 
 @dataclass()
@@ -290,12 +406,10 @@ class TextScanOutput(TextBase, ScanOutputBase):
     _fd: Any = None
 
     def __enter__(self):
-        if self.output_location == "-":
-            self._formatter = PrettyReport(fd=sys.stdout)
-            return
-
-        self._fd = open(self.output_location, "w")
-        self._formatter = PrettyReport(fd=self._fd)
+        # Formatter is bound to the output file descriptor so it's created again for every output
+        self._formatter = None
+        if self.output_location != "-":
+            self._fd = open(self.output_location, "w")
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self._fd:
@@ -303,57 +417,63 @@ class TextScanOutput(TextBase, ScanOutputBase):
 
     def output(self, hits, scan_metadata: dict):
         hits = set(hits)
-        imported_modules = {h.extra["name"] for h in hits if h.name == "ModuleImport"}
         score = 0
-        tags = set()
-        severities = Counter(get_severity(d) for d in hits)
+        tag_sets = []
 
         for h in hits:
             score += h.score
-            tags |= h.tags
-
-        score = sum(x.score for x in hits)
+            if h.tags:
+                tag_sets.append(h.tags)
 
         if score < self.min_score:
             return
 
+        tags = set().union(*tag_sets)
+        imported_modules = {h.extra["name"] for h in hits if h.name == "ModuleImport"}
+        severities = Counter(get_severity(d) for d in hits)
+
+        out = self.formatter
+        align = out.align
+
         secho("\n", file=self._fd, color=TTY_COLORS)  # Empty line for readability
-        self._formatter.print_top_separator()
-        self._formatter.print_heading(style(f"Scan results for {scan_metadata.get('name', 'N/A')}", fg="bright_green"))
+        out.print_top_separator()
+        out.print_heading(style(f"Scan results for {scan_metadata.get('name', 'N/A')}", fg="bright_green"))
         score_color = "bright_green" if score == 0 else "bright_red"
-        self._formatter.align(style(f"Scan score: {score}", fg=score_color, bold=True))
+        align(style(f"Scan score: {score}", fg=score_color, bold=True))
 
-        self._formatter.align("")
+        align("")
 
         for severity, color in SEVERITY_COLORS.items():
             count = severities[severity]
             if count == 0:
                 color = "bright_black"
-            self._formatter.align(style(f"{severity.capitalize()} severity - {count}x", fg=color))
+            align(_styled(f"{severity.capitalize()} severity - {count}x", fg=color))
 
-        self._formatter.align("")
+        align("")
 
         if len(tags) > 0:
-            self._formatter.align(f"Tags:")
+            align(f"Tags:")
             for t in tags:
-                self._formatter.align(f" - {t}")
+                align(f" - {t}")
 
         if imported_modules:
-            self._formatter.print_heading("Imported modules")
+            out.print_heading("Imported modules")
             for line in self.pprint_imports(self.imports_to_tree(imported_modules)):
-                self._formatter.align(line)
+                align(line)
         else:
-            self._formatter.print_heading("No imported modules detected")
+            out.print_heading("No imported modules detected")
 
         if hits:
-            self._formatter.print_heading("Code detections")
+            out.print_heading("Code detections")
             for h in hits:
-                self._formatter.print_thick_separator()
+                out.print_thick_separator()
                 self._format_detection(h._asdict(), top_separator=False, bottom_separator=False)
+                out.flush()
         else:
-            self._formatter.print_heading(style("No code detections has been triggered", fg="bright_green"))
+            out.print_heading(style("No code detections has been triggered", fg="bright_green"))
 
-        self._formatter.print_bottom_separator()
+        out.print_bottom_separator()
+        out.flush()
 
 
 class TextInfoOutput(InfoOutputBase):
@@ -427,6 +547,7 @@ class TextInfoOutput(InfoOutputBase):
                 out.align(f"{lhs} \u2502 {rhs}")
 
         out.print_bottom_separator()
+        out.flush()
 
 
 class TextTyposquattingOutput(TyposquattingOutputBase):
@@ -448,19 +569,19 @@ class TextDiffOutput(TextBase, DiffOutputBase):
     _fd: Any = None
 
     def __enter__(self):
-        if self.output_location == "-":
-            self._formatter = PrettyReport(fd=sys.stdout)
-            return
-
-        self._fd = open(self.output_location, "w")
-        self._formatter = PrettyReport(fd=self._fd)
+        # Formatter is bound to the output file descriptor so it's created again for every output
+        self._formatter = None
+        if self.output_location != "-":
+            self._fd = open(self.output_location, "w")
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self._fd:
             self._fd.close()
 
     def output_diff(self, diff_analyzer):
-        out = PrettyReport(fd=self._fd)
+        # Detections are formatted via `self.formatter`, it must share the output buffer
+        out = self.formatter
+        align = out.align
 
         if diff_analyzer.tables:
             out.print_tables(*diff_analyzer.tables)
@@ -470,30 +591,21 @@ class TextDiffOutput(TextBase, DiffOutputBase):
 
             if diff.operation in ("M", "R"):
                 op = "Modified" if diff.operation == "M" else "Renamed"
-                out.align(style(f"{op} file. Similarity: {int(diff.similarity * 100)}%", fg="bright_red", bold=True))
-                out.align(f"A Path: {style(diff.a_ref, fg='bright_blue')}")
-                out.align(f"B Path: {style(diff.b_ref, fg='bright_blue')}")
+                align(style(f"{op} file. Similarity: {int(diff.similarity * 100)}%", fg="bright_red", bold=True))
+                align(f"A Path: {style(diff.a_ref, fg='bright_blue')}")
+                align(f"B Path: {style(diff.b_ref, fg='bright_blue')}")
             elif diff.operation == "A":
-                out.align(style(f"File added.", fg="bright_yellow"))
-                out.align(f"Path: {style(diff.b_ref, fg='bright_blue')}")
+                align(_styled("File added.", fg="bright_yellow"))
+                align(f"Path: {style(diff.b_ref, fg='bright_blue')}")
             elif diff.operation == "D":
-                out.align(style(f"File removed", fg="green"))
-                out.align(f"Path: {style(diff.a_ref, fg='bright_blue')}")
+                align(_styled("File removed", fg="green"))
+                align(f"Path: {style(diff.a_ref, fg='bright_blue')}")
 
             if diff.diff and self.patch:
                 out.print_heading("START OF DIFF")
 
                 for diff_line in diff.diff.splitlines():
-                    if diff_line.startswith("@@"):
-                        opts = {"fg": "bright_blue"}
-                    elif diff_line.startswith("+"):
-                        opts = {"fg": "bright_green"}
-                    elif diff_line.startswith("-"):
-                        opts = {"fg": "bright_red"}
-                    else:
-                        opts = {"fg": "bright_black"}
-
-                    out.align(style(diff_line, **opts))
+                    align(style(diff_line, fg=DIFF_LINE_COLORS.get(diff_line[:1], "bright_black")))
 
                 out.print_heading("END OF DIFF")
 
@@ -501,19 +613,20 @@ class TextDiffOutput(TextBase, DiffOutputBase):
                 out.print_separator()
 
             if diff.removed_detections:
-                out.print_heading(style("Removed detections for this file", fg="bright_yellow"))
+                out.print_heading(_styled("Removed detections for this file", fg="bright_yellow"))
                 for x in diff.removed_detections:
                     out.print_separator()
                     x = x._asdict()
-                    header = style(f"Removed: '{x['type']}'", fg="green", bold=True)
+                    header = _styled(f"Removed: '{x['type']}'", fg="green", bold=True)
                     self._format_detection(x, header=header, bottom_separator=False, top_separator=False)
 
             if diff.new_detections:
-                out.print_heading(style("New detections for this file", fg="bright_red"))
+                out.print_heading(_styled("New detections for this file", fg="bright_red"))
                 for x in diff.new_detections:
                     out.print_separator()
                     x = x._asdict()
-                    header = style(f"Added: '{x['type']}'", fg="red", bold=True)
+                    header = _styled(f"Added: '{x['type']}'", fg="red", bold=True)
                     self._format_detection(x, header=header, bottom_separator=False, top_separator=False)
 
             out.print_separator(left="\u2558", sep="\u2550", right="\u255B")
+            out.flush()
@@ -3,8 +3,7 @@ import importlib
 import importlib.util
 from typing import List, Optional
 
-import pkg_resources
-
+from . import config
 from . import exceptions
 from .type_definitions import AnalyzerType, ScanLocation
 from .analyzers.base import NodeAnalyzerV2
@@ -40,7 +39,7 @@ def load_entrypoint(name: str, names=None) -> dict:
         "entrypoints": {},
         "disabled": [],
     }
-    for x in pkg_resources.iter_entry_points(name):
+    for x in config.iter_entry_points(name):
         if names and x.name not in names:
             # Prevent AST analyzers from being loaded if they are not specified in the names
             continue
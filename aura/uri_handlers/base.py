@@ -17,7 +17,6 @@ from typing import Union, Optional, Generator, Tuple, Iterable
 from warnings import warn
 
 import tlsh
-import pkg_resources
 import magic
 
 from .. import config
@@ -72,7 +71,7 @@ class URIHandler(ABC):
 
         if not HANDLERS:
             handlers = {}
-            for x in pkg_resources.iter_entry_points("aura.uri_handlers"):
+            for x in config.iter_entry_points("aura.uri_handlers"):
                 try:
                     hook = x.load()
                     handlers[hook.scheme] = hook
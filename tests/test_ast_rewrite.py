@@ -58,6 +58,31 @@ def test_binop_string():
     assert str(tree) == "hello_world"
 
 
+@pytest.mark.parametrize("src,result", (
+    ('"a" + "b" + "c" + "d"', "abcd"),
+    ('"a" + ("b" + "c") + "d"', "abcd"),
+    ('"Hello %s" % ("wor" + "ld")', "Hello world"),
+))
+def test_binop_string_chain(src, result):
+    tree = process_source_code(src)
+    assert isinstance(tree, String)
+    assert str(tree) == result
+
+
+def test_binop_string_mixed_chain():
+    # Only the string operands that are next to each other in the chain can be folded
+    tree = process_source_code('"a" + "b" + x + "c"')
+    assert isinstance(tree, BinOp)
+    assert isinstance(tree.right, String) and str(tree.right) == "c"
+    assert isinstance(tree.left, BinOp)
+    assert tree.left.right == "x"
+    assert isinstance(tree.left.left, String) and str(tree.left.left) == "ab"
+
+    tree = process_source_code('x + ("a" + "b" + "c")')
+    assert isinstance(tree, BinOp)
+    assert isinstance(tree.right, String) and str(tree.right) == "abc"
+
+
 def test_binop_numbers():
     src = """
     20 + 22
@@ -98,3 +98,45 @@ def test_mirror_cache_no_remote_access(mirror_mock, cache_mock, fixtures, tmp_pa
     (cache_path/f"mirrorjson_{pkg}").write_text(json.dumps(pkg_content))
     out = m.get_json(pkg)
     assert out == pkg_content
+
+
+@mock.patch("aura.cache.Cache.get_location")
+def test_ast_tree_cache(cache_mock, fixtures, tmp_path):
+    from aura.analyzers.python import visitor
+    from aura.uri_handlers.base import ScanLocation
+
+    cache_path = tmp_path / "cache"
+    cache_path.mkdir()
+    cache_mock.return_value = cache_path
+    src = tmp_path / "test_source.py"
+    src.write_text("x = 'Hello world'\nprint(x)\n")
+    loc = ScanLocation(location=src, metadata={"depth": 0})
+
+    tree = visitor.get_ast_tree(loc)
+    assert len(list(cache_path.iterdir())) == 1
+
+    with mock.patch("aura.python_executor.run_with_interpreters", side_effect=ValueError("Call prohibited")):
+        cached_tree = visitor.get_ast_tree(loc)
+        assert cached_tree == tree
+        # Cached tree must be a copy as the visitors are modifying it in place
+        assert cached_tree is not visitor.get_ast_tree(loc)
+
+    # Same source code extracted to a different location must be served from the cache
+    copy_dir = tmp_path / "extracted"
+    copy_dir.mkdir()
+    (copy_dir / "test_source.py").write_text(src.read_text())
+    copy_loc = ScanLocation(location=copy_dir / "test_source.py", metadata={"depth": 0})
+    with mock.patch("aura.python_executor.run_with_interpreters", side_effect=ValueError("Call prohibited")):
+        assert visitor.get_ast_tree(copy_loc) == tree
+
+    # Modified source code must not be served from the cache
+    src.write_text("y = 10\n")
+    new_tree = visitor.get_ast_tree(loc)
+    assert new_tree != tree
+    assert len(list(cache_path.iterdir())) == 2
+
+    # Least recently used trees are evicted above the configured limit
+    with mock.patch("aura.config.get_settings", return_value=1):
+        cache.Cache.evict_ast_trees()
+
+    assert len(list(cache_path.iterdir())) == 1
@@ -172,3 +172,21 @@ patterns:
     finally:
         del os.environ["AURA_SIGNATURES"]
         config.load_config()
+
+
+def test_config_reload_on_modification(tmp_path):
+    from aura import config
+
+    cfg_pth = tmp_path / "custom_cfg.yml"
+    cfg_pth.write_text("---\naura:\n    <<: *aura_config\n    test_key: first\n")
+
+    cfg = config.parse_config(str(cfg_pth), config.DEFAULT_CFG_PATH)
+    assert cfg["aura"]["test_key"] == "first"
+    # Modifying the returned config must not affect the cached one
+    cfg["aura"]["test_key"] = "modified"
+    assert config.parse_config(str(cfg_pth), config.DEFAULT_CFG_PATH)["aura"]["test_key"] == "first"
+
+    cfg_pth.write_text("---\naura:\n    <<: *aura_config\n    test_key: second\n")
+    stat = cfg_pth.stat()
+    os.utime(cfg_pth, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert config.parse_config(str(cfg_pth), config.DEFAULT_CFG_PATH)["aura"]["test_key"] == "second"
@@ -366,3 +366,96 @@ def test_sarif_output(infile, fixtures):
 
     output = fixtures.scan_test_file(infile, args=["-f", "sarif"])
     jsonschema.validate(output, schema)
+
+
+@pytest.mark.parametrize("line,length", (
+    ("", 0),
+    ("plain text", 10),
+    ("\x1b[1mbold\x1b[0m", 4),
+    ("a \x1b[32;1mgreen\x1b[0m b", 9),
+))
+def test_text_ansi_length(line, length):
+    from aura.output.text import PrettyReport
+
+    assert PrettyReport.ansi_length(line) == length
+
+
+def test_text_imports_to_tree():
+    from aura.output.text import TextScanOutput
+
+    tree = TextScanOutput().imports_to_tree(["os", "os.path", "os.path", "xml.etree.ElementTree", "xml.dom"])
+    assert tree == {
+        "os": {"path": {}},
+        "xml": {"etree": {"ElementTree": {}}, "dom": {}}
+    }
+
+
+def test_text_pprint_imports():
+    from aura.output.text import TextScanOutput, PrettyReport
+
+    tree = {"a": {"b": {"c": {}, "d": {"e": {}}}, "f": {}}, "g": {}, "h": {"i": {}}}
+    lines = [PrettyReport.ANSI_RE.sub("", x) for x in TextScanOutput().pprint_imports(tree)]
+    assert lines == ["┬ a", "│┬ b", "││┬ c", "││└ d", "││ └ e", "│└ f", "├ g", "└ h", " └ i"]
+
+
+@pytest.mark.parametrize("line,overflow,expected", (
+    ("abcdefghijklmnop", 4, "abcdef [...]"),
+    ("ab\x1b[1mcdefghijklmnop\x1b[0mqr", 4, "ab\x1b[1mcdef [...]\x1b[0mqr"),
+    # The escape sequence at the end must not be the one shortened
+    ("\x1b[1mabcdefghij\x1b[0m", 2, "\x1b[1mab [...]\x1b[0m"),
+))
+def test_text_truncate(line, overflow, expected):
+    from aura.output.text import PrettyReport
+
+    assert PrettyReport._truncate(line, overflow) == expected
+
+
+def test_text_report_flush(tmp_path):
+    from aura.output.text import PrettyReport
+    from click import style
+
+    out_pth = tmp_path / "report.txt"
+    with out_pth.open("w") as fd:
+        fd.write("header\n")
+        report = PrettyReport(fd=fd)
+        report.align(style("styled", fg="red"))
+        report.print_separator()
+        report.flush()
+        report.flush()
+
+    lines = out_pth.read_text().splitlines()
+    assert len(lines) == 3
+    assert lines[0] == "header"
+    # Styles are stripped when not writing to a terminal
+    assert "\x1b" not in lines[1]
+    assert lines[1].startswith("│ styled ")
+
+
+def test_text_format_detection_without_location():
+    import io
+    from aura.output.text import TextScanOutput
+
+    fd = io.StringIO()
+    output = TextScanOutput(_fd=fd)
+    output._format_detection({"type": "Test", "severity": "low", "message": "test message", "score": 5, "line_no": 12})
+    output.formatter.flush()
+
+    text = fd.getvalue()
+    assert "Line 12 at N/A" in text
+    assert "Score: 5" in text
+
+
+def test_text_format_detection_tags():
+    import io
+    from aura.output.text import TextScanOutput
+
+    hit = {"type": "Test", "severity": "low", "message": "test message", "score": 5}
+    fd = io.StringIO()
+    output = TextScanOutput(_fd=fd)
+    output._format_detection(hit)
+    output._format_detection(dict(hit, tags=["tag_a", "tag_b"]))
+    output.formatter.flush()
+
+    text = fd.getvalue()
+    assert text.count("Tags:") == 1
+    assert "Tags: tag_a, tag_b" in text
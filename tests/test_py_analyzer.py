@@ -24,3 +24,27 @@ def test_py2k(fixtures):
         data = fixtures.get_raw_ast(fd.read())
 
     assert data
+
+
+def test_convergence_passes_visit_whole_tree():
+    from aura.analyzers.python_src_inspector import collect
+    from aura.uri_handlers.base import ScanLocation
+
+    class CountingVisitor(visitor.Visitor):
+        def _init_visit(self, context):
+            self.visited = getattr(self, "visited", [])
+            self.visited.append(0)
+
+        def _visit_node(self, context):
+            self.visited[-1] += 1
+
+    v = CountingVisitor(location=ScanLocation(location="<unknown>"))
+    v._convergence_passes = v.convergence = 3
+    v.tree = collect("x = 1\nfoo(x, 'a' + 'b')\n", minimal=True)
+    v.traverse()
+
+    # Tree is not modified so all the passes after the first one are convergence passes
+    # Each of them must visit all the nodes
+    assert len(v.visited) == 3
+    assert v.visited[0] > 0
+    assert v.visited[0] == v.visited[1] == v.visited[2]